@@ -6,7 +6,14 @@ class GreenhouseGUI:
     GUI controller for greenhouse control unit. Controls creation of labels, text fields, buttons, and dynamically placing them.
     """
 
-    __small_font = QtGui.QFont("Times", 9)
+    PROMPT = "Please enter new values for greenhouse control"
+
+    # Widgets with the "small" property set use the small font
+    STYLESHEET = """
+        #greenhouse, #greenhouse * { background-color: lavender; }
+        #greenhouse *[small="true"] { font: 9pt "Times"; }
+    """
+
     __default_field_height = 24
     __default_field_width = 100
 
@@ -30,6 +37,9 @@ class GreenhouseGUI:
 
         self.submit_button = None
         self.submit_label = None
+        self.undo_button = None
+        self.redo_button = None
+        self.autosave_button = None
 
     def setupUI(self, main_window: QtWidgets.QMainWindow, width: int, height: int) -> None:
         """
@@ -41,7 +51,7 @@ class GreenhouseGUI:
         :return: None
         """
 
-        main_window.setStyleSheet("background-color: lavender;")
+        main_window.setObjectName("greenhouse")
 
         # ------------- Top line of gui labels / fields / buttons -------------
         side_offset = int(width / 12) * 2
@@ -82,8 +92,14 @@ class GreenhouseGUI:
         self.photo_button.setFixedWidth(200)
         self.photo_field = self.__create_label_field_side(main_window, "Photo Timer", side_offset, top_offset_photos)
 
+        # Autosave toggle sits under the photo settings
+        self.autosave_button = QtWidgets.QRadioButton("Autosave", main_window)
+        self.autosave_button.move(side_offset, top_offset_photos + 57)
+        self.autosave_button.setFixedWidth(200)
+        self.autosave_button.setAutoExclusive(False)
+
         # Submit button + information label
-        self.submit_label = QtWidgets.QLabel("Please enter new values for greenhouse control", main_window)
+        self.submit_label = QtWidgets.QLabel(GreenhouseGUI.PROMPT, main_window)
         self.submit_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignHCenter)
         self.submit_label.move(int(side_offset * 3.5), top_offset + 7)
         self.submit_label.setFixedSize(side_offset * 2, int(top_offset * 2))
@@ -92,6 +108,28 @@ class GreenhouseGUI:
         self.submit_button.move(side_offset * 4, top_offset_photos + 27)
         self.submit_button.setDisabled(False)
 
+        # Undo / redo buttons sit to the right of submit
+        self.undo_button = QtWidgets.QPushButton("↶", main_window)
+        self.undo_button.setFixedSize(35, 25)
+        self.undo_button.move(side_offset * 4 + 105, top_offset_photos + 27)
+        self.undo_button.setToolTip("Undo last change")
+        self.redo_button = QtWidgets.QPushButton("↷", main_window)
+        self.redo_button.setFixedSize(35, 25)
+        self.redo_button.move(side_offset * 4 + 145, top_offset_photos + 27)
+        self.redo_button.setToolTip("Redo last undone change")
+
+    @staticmethod
+    def set_field_error(field: QtWidgets.QLineEdit, message: str = None) -> None:
+        """
+        Marks a field as invalid with a red border and the error as its tooltip, or clears the mark
+        :param field: Line edit field to mark
+        :param message: Error message, None to clear
+        :return: None
+        """
+
+        field.setStyleSheet("border: 1px solid red;" if message else "")
+        field.setToolTip(message or "")
+
     @staticmethod
     def __create_label_field(window: QtWidgets.QMainWindow, label_text: str, x: int, y: int, width: int = __default_field_width, height: int = __default_field_height) -> tuple:
         """
@@ -106,7 +144,7 @@ class GreenhouseGUI:
         """
 
         label = QtWidgets.QLabel(label_text, window)
-        label.setFont(GreenhouseGUI.__small_font)
+        label.setProperty("small", True)
         # Add some padding to label so text is not cut off by moving
         # label left 25 units, add 50 units to width, and center.
         label.move(x-25, y-height)
@@ -116,7 +154,7 @@ class GreenhouseGUI:
         field = QtWidgets.QLineEdit(window)
         field.move(x, y)
         field.setFixedSize(width, height)
-        field.setFont(GreenhouseGUI.__small_font)
+        field.setProperty("small", True)
 
         return label, field
 
@@ -142,3 +180,8 @@ class GreenhouseGUI:
         tmp_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignLeft)
 
         return return_field
+
+
+# Styles for every window of the app, set once on the QApplication by main.py or the launcher so they are
+# parsed once and shared by every window
+STYLESHEET = GreenhouseGUI.STYLESHEET
@@ -0,0 +1,533 @@
+import argparse
+import getpass
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from bisect import bisect_right
+from datetime import datetime
+from settings import SETTINGS, SettingsSchema
+
+
+class RevisionStack:
+    """
+    Stack of revision numbers stored as runs of consecutive revisions. Undo stacks are mostly long runs of
+    consecutive submits, so millions of entries take a handful of runs in memory and in the history index.
+    """
+
+    def __init__(self, runs: list = None):
+        """
+        :param runs: List of [first, last] runs, bottom of the stack first
+        """
+
+        self.runs = [list(run) for run in runs] if runs else []
+
+    def __bool__(self) -> bool:
+        """
+        :return: True if the stack is not empty
+        """
+
+        return bool(self.runs)
+
+    def __contains__(self, revision: int) -> bool:
+        """
+        :param revision: Revision number
+        :return: True if the revision is on the stack
+        """
+
+        return any(first <= revision <= last for first, last in self.runs)
+
+    def top(self) -> int:
+        """
+        :return: Revision on top of the stack
+        """
+
+        return self.runs[-1][1]
+
+    def push(self, revision: int) -> None:
+        """
+        :param revision: Revision number to push
+        :return: None
+        """
+
+        if self.runs and self.runs[-1][1] + 1 == revision:
+            self.runs[-1][1] = revision
+        else:
+            self.runs.append([revision, revision])
+
+    def clear(self) -> None:
+        """
+        :return: None
+        """
+
+        self.runs.clear()
+
+    def discard(self, revision: int) -> None:
+        """
+        Removes a revision from the stack if present, normally from the top
+        :param revision: Revision number
+        :return: None
+        """
+
+        for index in range(len(self.runs) - 1, -1, -1):
+            first, last = self.runs[index]
+            if first <= revision <= last:
+                split = [run for run in ([first, revision - 1], [revision + 1, last]) if run[0] <= run[1]]
+                self.runs[index:index + 1] = split
+                return
+
+
+class SettingsHistory:
+    """
+    Revision history for settings.json. Every change is stored only as a delta of the fields that changed,
+    and the history doubles as the audit trail of who changed what and when.
+
+    Revisions are grouped into chunks of checkpoint_interval. New revisions are appended to a JSON lines log,
+    and once a chunk is full it is packed into a single compressed frame in "<log>.pack", together with a
+    snapshot of the settings at its start, and the log is emptied. Where each frame is and when it starts are
+    appended to "<log>.chunks" as fixed size records, and a small "<log>.index" holds the number of packed
+    chunks, the latest state, and the undo / redo stacks. Packing a chunk only appends to those files and
+    rewrites the small index, so it costs the same however long the history is, and opening the history
+    only reads the chunk records, the index, and the unpacked tail of the log. Any revision is rebuilt by
+    reading one frame.
+
+    Undo and redo never rewrite history, they append a new revision that inverts or re-applies an earlier one.
+    """
+
+    __UNDOABLE = ("submit", "autosave")
+    __CHUNK_RECORD = struct.Struct("<QId")  # Frame offset, frame length, time of the chunk's first revision
+
+    def __init__(self, path: str = "settings_history.jsonl", checkpoint_interval: int = 256):
+        """
+        :param path: Log file to load and append to, or None to keep history in memory only
+        :param checkpoint_interval: Number of revisions per packed chunk, ignored for an existing history
+        """
+
+        self.__path = path
+        self.__interval = checkpoint_interval
+        self.__author = SettingsHistory.__current_user()
+        self.__loading = False
+        self.__log = None
+
+        # Packed chunks: (offset, length) in the pack file, or the frame bytes when in memory only, and the
+        # time of each chunk's first revision for as_of lookups
+        self.__chunks = []
+        self.__chunk_times = []
+        self.__cached_chunk = (None, None)
+
+        # Unpacked revisions as (time, author, action, target, delta) tuples, and the state before the first
+        self.__recent = []
+        self.__recent_checkpoint = {}
+        self.__head = {}
+
+        self.__undo_stack = RevisionStack()
+        self.__redo_stack = RevisionStack()
+
+        if path is not None:
+            self.__load()
+
+    def __len__(self) -> int:
+        """
+        :return: Number of revisions recorded
+        """
+
+        return len(self.__chunks) * self.__interval + len(self.__recent)
+
+    @staticmethod
+    def __current_user() -> str:
+        """
+        Gets the name of the logged in user for the audit trail
+        :return: str
+        """
+
+        try:
+            return getpass.getuser()
+        except (KeyError, OSError):
+            return "unknown"
+
+    @staticmethod
+    def flatten(data: dict) -> dict:
+        """
+        Converts a nested settings dict to a flat dict of schema path -> value
+        :param data: Settings dict
+        :return: dict
+        """
+
+        return {path: SettingsSchema.get(data, field.keys) for path, field in SETTINGS.fields.items()}
+
+    @staticmethod
+    def unflatten(flat: dict) -> dict:
+        """
+        Converts a flat dict of schema path -> value back to a nested settings dict
+        :param flat: Flat settings dict
+        :return: dict
+        """
+
+        data = SETTINGS.defaults()
+        for path, value in flat.items():
+            if path in SETTINGS.fields:
+                SettingsSchema.put(data, SETTINGS.fields[path].keys, value)
+        return data
+
+    def __load(self) -> None:
+        """
+        Restores the packed history from the index, then replays the unpacked tail of the log. Log lines are
+        numbered, so lines already packed before a crash are skipped, and revisions lost to a line cut off by
+        a crash are filled in with placeholders so later revision numbers still line up.
+        :return: None
+        """
+
+        if os.path.exists(self.__path + ".index"):
+            with open(self.__path + ".index", "rb") as index_file:
+                index = json.loads(zlib.decompress(index_file.read()))
+            self.__interval = index["interval"]
+
+            # Records and frames past the indexed chunks are from a pack cut off by a crash before the index
+            # was replaced, their revisions are still in the log and get packed again below
+            size = SettingsHistory.__CHUNK_RECORD.size
+            with open(self.__path + ".chunks", "r+b") as chunks_file:
+                records = chunks_file.read(index["chunks"] * size)
+                chunks_file.truncate(index["chunks"] * size)
+            for offset, length, first_time in SettingsHistory.__CHUNK_RECORD.iter_unpack(records):
+                self.__chunks.append((offset, length))
+                self.__chunk_times.append(first_time)
+            if self.__chunks:
+                with open(self.__path + ".pack", "r+b") as pack:
+                    pack.truncate(sum(self.__chunks[-1]))
+
+            self.__head = index["head"]
+            self.__recent_checkpoint = dict(self.__head)
+            self.__undo_stack = RevisionStack(index["undo"])
+            self.__redo_stack = RevisionStack(index["redo"])
+
+        if not os.path.exists(self.__path):
+            return
+
+        with open(self.__path, encoding='utf-8') as log:
+            lines = log.read().split("\n")
+
+        # Make sure the next record starts on its own line if the last one was cut off
+        if lines[-1]:
+            with open(self.__path, "a", encoding='utf-8') as log:
+                log.write("\n")
+
+        self.__loading = True
+        packed = len(self.__chunks)
+        for line in lines:
+            try:
+                record = json.loads(line)
+                delta = tuple((sys.intern(path), old, new) for path, (old, new) in record["changes"].items())
+                timestamp, author, action, target = record["time"], record["author"], record["action"], record.get("target")
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                continue  # Skip a line cut off by a crash mid-write rather than losing the whole history
+
+            revision = record.get("revision", len(self))
+            if revision < len(self):
+                continue  # Already packed
+
+            # Fill in lost revisions, the last placeholder brings the state up to what this record started from
+            while revision > len(self):
+                lost = tuple((path, self.__head.get(path), old) for path, old, __ in delta if self.__head.get(path) != old)
+                self.__append(timestamp, "unknown", "lost", None, lost if revision == len(self) + 1 else ())
+
+            self.__append(timestamp, author, action, target, delta)
+        self.__loading = False
+
+        # Chunks packed while loading came from the log, so rewrite it with only what is still unpacked
+        if len(self.__chunks) != packed:
+            with open(self.__path, "w", encoding='utf-8') as log:
+                for offset, (timestamp, author, action, target, delta) in enumerate(self.__recent):
+                    log.write(SettingsHistory.__format(len(self.__chunks) * self.__interval + offset,
+                                                       timestamp, author, action, target, delta))
+
+    @staticmethod
+    def __format(revision: int, timestamp: float, author: str, action: str, target: int, delta: tuple) -> str:
+        """
+        Formats a revision as a log line
+        :return: str
+        """
+
+        return json.dumps({"revision": revision, "time": timestamp, "author": author, "action": action,
+                           "target": target, "changes": {path: [old, new] for path, old, new in delta}}) + "\n"
+
+    def __append(self, timestamp: float, author: str, action: str, target: int, delta: tuple) -> int:
+        """
+        Records a revision in memory, updating the head state and undo / redo stacks, and packs the
+        chunk once it is full
+        :param timestamp: Time of the change in seconds since the epoch
+        :param author: User who made the change
+        :param action: One of "load", "submit", "autosave", "undo", "redo", or "lost"
+        :param target: Revision undone or redone, None for other actions
+        :param delta: Tuple of (path, old, new) for each changed field
+        :return: Number of the new revision
+        """
+
+        revision = len(self)
+        self.__recent.append((timestamp, sys.intern(author), sys.intern(action), target, delta))
+
+        for path, __, new in delta:
+            self.__head[path] = new
+
+        # Targets are looked up rather than assumed to be on top of the stack, so a history with lost
+        # revisions still replays
+        if action in SettingsHistory.__UNDOABLE:
+            self.__undo_stack.push(revision)
+            self.__redo_stack.clear()
+        elif action == "undo":
+            self.__undo_stack.discard(target)
+            self.__redo_stack.push(target)
+        elif action == "redo":
+            self.__redo_stack.discard(target)
+            self.__undo_stack.push(revision)
+
+        if len(self.__recent) == self.__interval:
+            self.__pack()
+
+        return revision
+
+    def __pack(self) -> None:
+        """
+        Compresses the full chunk of recent revisions into one frame with the state at its start. On disk the
+        frame is appended to the pack file and its record to the chunks file, then the index is replaced, then
+        the log is emptied, so a crash at any point leaves either the frame unused or the log lines skipped as
+        already packed.
+        :return: None
+        """
+
+        frame = zlib.compress(json.dumps({"checkpoint": self.__recent_checkpoint,
+                                          "revisions": [[timestamp, author, action, target, {path: [old, new] for path, old, new in delta}]
+                                                        for timestamp, author, action, target, delta in self.__recent]}).encode())
+        first_time = self.__recent[0][0]
+
+        if self.__path is None:
+            self.__chunks.append(frame)
+        else:
+            with open(self.__path + ".pack", "ab") as pack:
+                pack.seek(0, os.SEEK_END)
+                self.__chunks.append((pack.tell(), len(frame)))
+                pack.write(frame)
+            with open(self.__path + ".chunks", "ab") as chunks_file:
+                chunks_file.write(SettingsHistory.__CHUNK_RECORD.pack(*self.__chunks[-1], first_time))
+
+        self.__chunk_times.append(first_time)
+        self.__recent = []
+        self.__recent_checkpoint = dict(self.__head)
+
+        if self.__path is not None:
+            index = {"interval": self.__interval, "chunks": len(self.__chunks),
+                     "head": self.__head, "undo": self.__undo_stack.runs, "redo": self.__redo_stack.runs}
+            with open(self.__path + ".index.tmp", "wb") as index_file:
+                index_file.write(zlib.compress(json.dumps(index).encode()))
+            os.replace(self.__path + ".index.tmp", self.__path + ".index")
+
+            if not self.__loading:
+                self.__log.truncate(0)
+
+    def __record(self, action: str, target: int, delta: tuple) -> int:
+        """
+        Records a new revision and appends it to the log file, which is kept open between commits
+        :param action: One of "load", "submit", "autosave", "undo", or "redo"
+        :param target: Revision undone or redone, None for other actions
+        :param delta: Tuple of (path, old, new) for each changed field
+        :return: Number of the new revision
+        """
+
+        timestamp = time.time()
+        if self.__path is not None:
+            if self.__log is None:
+                self.__log = open(self.__path, "a", encoding='utf-8')
+            self.__log.write(SettingsHistory.__format(len(self), timestamp, self.__author, action, target, delta))
+            self.__log.flush()
+
+        return self.__append(timestamp, self.__author, action, target, delta)
+
+    def close(self) -> None:
+        """
+        Closes the log file, a later commit opens it again
+        :return: None
+        """
+
+        if self.__log is not None:
+            self.__log.close()
+            self.__log = None
+
+    def __chunk(self, index: int) -> tuple:
+        """
+        Gets the state at the start of a chunk and its revisions, reading and unpacking the frame if it has been
+        packed. The last unpacked frame is cached since lookups (undo of a recent change, walking the audit
+        trail) tend to hit the same one.
+        :param index: Chunk number
+        :return: Tuple of (flat state at chunk start, list of (time, author, action, target, delta) tuples)
+        """
+
+        if index == len(self.__chunks):
+            return self.__recent_checkpoint, self.__recent
+        if self.__cached_chunk[0] == index:
+            return self.__cached_chunk[1]
+
+        if self.__path is None:
+            frame = self.__chunks[index]
+        else:
+            offset, length = self.__chunks[index]
+            with open(self.__path + ".pack", "rb") as pack:
+                pack.seek(offset)
+                frame = pack.read(length)
+
+        chunk = json.loads(zlib.decompress(frame))
+        revisions = [(timestamp, author, action, target, tuple((path, old, new) for path, (old, new) in changes.items()))
+                     for timestamp, author, action, target, changes in chunk["revisions"]]
+        self.__cached_chunk = (index, (chunk["checkpoint"], revisions))
+        return self.__cached_chunk[1]
+
+    def __revision(self, revision: int) -> tuple:
+        """
+        :param revision: Revision number
+        :return: Tuple of (time, author, action, target, delta) for that revision
+        """
+
+        return self.__chunk(revision // self.__interval)[1][revision % self.__interval]
+
+    def commit(self, data: dict, action: str = "submit") -> int:
+        """
+        Records the difference between the latest revision and data
+        :param data: New settings dict
+        :param action: "load" for states picked up from settings.json, "submit" or "autosave" for user edits
+        :return: Number of the new revision, or None if nothing changed
+        """
+
+        flat = SettingsHistory.flatten(data)
+        delta = tuple((path, self.__head.get(path), value) for path, value in flat.items()
+                      if path not in self.__head or self.__head[path] != value)
+        if not delta:
+            return None
+        return self.__record(action, None, delta)
+
+    def can_undo(self) -> bool:
+        """
+        :return: True if there is a change to undo
+        """
+
+        return bool(self.__undo_stack)
+
+    def can_redo(self) -> bool:
+        """
+        :return: True if there is an undone change to redo
+        """
+
+        return bool(self.__redo_stack)
+
+    def undo(self) -> dict:
+        """
+        Reverts the most recent change that has not been undone
+        :return: Settings dict after the undo, or None if there is nothing to undo
+        """
+
+        if not self.__undo_stack:
+            return None
+
+        target = self.__undo_stack.top()
+        delta = tuple((path, self.__head.get(path), old) for path, old, __ in self.__revision(target)[4]
+                      if old is not None and self.__head.get(path) != old)
+        self.__record("undo", target, delta)
+        return self.head()
+
+    def redo(self) -> dict:
+        """
+        Re-applies the most recently undone change
+        :return: Settings dict after the redo, or None if there is nothing to redo
+        """
+
+        if not self.__redo_stack:
+            return None
+
+        target = self.__redo_stack.top()
+        delta = tuple((path, self.__head.get(path), new) for path, __, new in self.__revision(target)[4]
+                      if self.__head.get(path) != new)
+        self.__record("redo", target, delta)
+        return self.head()
+
+    def head(self) -> dict:
+        """
+        :return: Settings dict at the latest revision, or None if there are no revisions
+        """
+
+        return SettingsHistory.unflatten(self.__head) if len(self) else None
+
+    def at(self, revision: int) -> dict:
+        """
+        Rebuilds the settings at a revision from the snapshot at the start of its chunk
+        :param revision: Revision number, negative numbers count back from the latest
+        :return: Settings dict
+        """
+
+        revision = range(len(self))[revision]  # Raises IndexError when out of range
+        checkpoint, revisions = self.__chunk(revision // self.__interval)
+        flat = dict(checkpoint)
+        for __, __, __, __, delta in revisions[:revision % self.__interval + 1]:
+            for path, __, new in delta:
+                flat[path] = new
+        return SettingsHistory.unflatten(flat)
+
+    def as_of(self, timestamp: float) -> dict:
+        """
+        Finds the settings that were in effect at a point in time
+        :param timestamp: Time in seconds since the epoch
+        :return: Settings dict, or None if the history starts after timestamp
+        """
+
+        if self.__recent and timestamp >= self.__recent[0][0]:
+            index = len(self.__chunks)
+        else:
+            index = bisect_right(self.__chunk_times, timestamp) - 1
+            if index < 0:
+                return None
+
+        revisions = self.__chunk(index)[1]
+        offset = bisect_right([revision[0] for revision in revisions], timestamp) - 1
+        return self.at(index * self.__interval + offset)
+
+    def entry(self, revision: int) -> dict:
+        """
+        Gets the audit trail entry for a revision
+        :param revision: Revision number
+        :return: Dict of time, author, action, target, and changes as path -> (old, new)
+        """
+
+        timestamp, author, action, target, delta = self.__revision(range(len(self))[revision])
+        return {"time": timestamp,
+                "author": author,
+                "action": action,
+                "target": target,
+                "changes": {path: (old, new) for path, old, new in delta}}
+
+
+def main() -> None:
+    """
+    Prints the audit trail, or the settings as of a revision or point in time
+    :return: None
+    """
+
+    parser = argparse.ArgumentParser(description="Inspect greenhouse settings history")
+    parser.add_argument("log", nargs="?", default="settings_history.jsonl", help="history log file")
+    parser.add_argument("--as-of", help="print settings in effect at this time (i.e \"2026-10-18 03:00\")")
+    parser.add_argument("--revision", type=int, help="print settings at this revision")
+    args = parser.parse_args()
+
+    history = SettingsHistory(args.log)
+    if args.as_of is not None:
+        print(json.dumps(history.as_of(datetime.fromisoformat(args.as_of).timestamp()), indent=4))
+    elif args.revision is not None:
+        print(json.dumps(history.at(args.revision), indent=4))
+    else:
+        for revision in range(len(history)):
+            entry = history.entry(revision)
+            when = datetime.fromtimestamp(entry["time"]).strftime("%Y-%m-%d %H:%M:%S")
+            target = f" r{entry['target']}" if entry["target"] is not None else ""
+            changes = ", ".join(f"{path}: {old} -> {new}" for path, (old, new) in entry["changes"].items())
+            print(f"r{revision} {when} {entry['author']} {entry['action']}{target}: {changes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,109 @@
+import copy
 import json
+import logging
+import os
+import time
 from gui import *
+from history import SettingsHistory
+from settings import SETTINGS, SettingsSchema, UnsupportedVersionError
 from PyQt6.QtWidgets import *
 
+logger = logging.getLogger(__name__)
+
 
 class Logic(QMainWindow, GreenhouseGUI):
     """
     The Logic class is responsible for generating values, converting units, reading and writing
-    files, validating input, and beginning UI initialization.
+    files, validating input, recording settings history, and beginning UI initialization.
     """
 
-    __start_dict = {"humidity": 0.0,
-                    "co2": 0,
-                    "temp": {"degrees": 0.0, "unit": "f"},
-                    "light": {"enabled": False, "on_time": 0.0, "off_time": 0.0},
-                    "photo": {"enabled": False, "timer": 0.0}}
+    __AUTOSAVE_DELAY = 1000  # Milliseconds without edits before an autosave
+    __COUPLED = (("temp.degrees", "temp.unit"),)  # Paths that only make sense saved together
 
-    def __init__(self, width: int, height: int):
+    def __init__(self, width: int, height: int, settings_dir: str = "."):
         """
         :param width: Target application width
         :param height: Target application height
+        :param settings_dir: Directory settings.json and its history are kept in
         """
 
         super().__init__()
 
         self.__current_unit = None
+        self.__text_fields = None
+        self.__read_only = False
+        self.__load_status = None
+        self.__settings_path = os.path.join(settings_dir, "settings.json")
+        self.__history = SettingsHistory(os.path.join(settings_dir, "settings_history.jsonl"))
+        self.__field_errors = {}
+        self.__dirty = set()
+        self.__autosave_timer = None
+        self.__key_pressed_at = None
+        self.__feedback_pending = False
+        self.__metrics = {"validations": 0, "feedback_samples": 0, "feedback_seconds": 0.0, "max_feedback_seconds": 0.0,
+                          "writes": 0, "autosaves": 0}
 
         # At this point window.geometry.getWidth() would not return dec_width, therefore to position
         # labels relative to window edge we pass these values in explicitly
         self.setupUI(self, width, height)
         self.setFixedSize(width, height)
 
-        # Try and read settings file, handling empty / corruption
-        with open("settings.json", "a+", encoding='utf-8') as settings:
+        # Kept on screen while typing until the next save resolves it (or for good while read-only)
+        self.__load_status = self.__read_settings()
+
+        # Picks up the initial state, or any edits made to settings.json outside of the app. Skipped while the
+        # loaded values differ from the file, the next save records them instead.
+        if self.__load_status is None:
+            self.__history.commit(self.data, "load")
+
+        self.__bindings_and_population()
+        if self.__load_status is not None:
+            self.submit_label.setText(self.__load_status)
+
+    def __read_settings(self) -> str:
+        """
+        Reads settings.json into self.data, migrating it from older versions. A file is only rewritten when it
+        was empty or upgraded cleanly. Files from a newer version of the app are opened read-only, unreadable
+        files are backed up before defaults are written, and invalid values are reset in memory only.
+        :return: Message for the user if anything could not be loaded as-is, otherwise None
+        """
+
+        with open(self.__settings_path, "a+", encoding='utf-8') as settings:
             settings.seek(0)
-            settings.flush()
             file_contents = settings.read()
 
-            try:
-                self.data = json.loads(file_contents, strict=False)
-            except json.JSONDecodeError as e:  # Empty / corrupted json, wipe file and rewrite our template
-                settings.seek(0)
-                settings.truncate(0)
-                json.dump(Logic.__start_dict, settings, indent=4)
-                self.data = Logic.__start_dict
+        if not file_contents.strip():  # New / empty file, start from defaults
+            self.data = SETTINGS.defaults()
+            self.__write_settings()
+            return None
 
-        self.__bindings_and_population()
+        try:
+            original = json.loads(file_contents, strict=False)
+        except json.JSONDecodeError:
+            original = None
+
+        # Corrupted json, keep a copy before starting over from defaults
+        if not isinstance(original, dict):
+            with open(self.__settings_path + ".bak", "w", encoding='utf-8') as backup:
+                backup.write(file_contents)
+            self.data = SETTINGS.defaults()
+            self.__write_settings()
+            return "Saved settings could not be read and were reset to defaults. A copy was kept in settings.json.bak"
+
+        try:
+            self.data, reset = SETTINGS.load(dict(original))
+        except UnsupportedVersionError as e:
+            # Show what we can, but never write over a file we could not migrate
+            self.data, __ = SETTINGS.load({**original, "version": SETTINGS.version})
+            self.__read_only = True
+            return f"{e}. Settings are read-only"
+
+        if reset:
+            return f"Saved values were invalid and have been reset to defaults: {', '.join(reset)}. Submit to save"
+
+        if self.data != original:
+            self.__write_settings()
+        return None
 
     def __bindings_and_population(self) -> None:
         """
@@ -52,35 +111,15 @@ class Logic(QMainWindow, GreenhouseGUI):
         :return: None
         """
 
-        # Populate humidity field
-        self.humidity_field.setText(self.__clean_float(self.data["humidity"]))
+        # Text fields keyed by their path in the settings schema
+        self.__text_fields = {"humidity": self.humidity_field,
+                              "co2": self.co2_field,
+                              "temp.degrees": self.temp_field,
+                              "light.on_time": self.light_on_field,
+                              "light.off_time": self.light_off_field,
+                              "photo.timer": self.photo_field}
 
-        # Populate temperature fields
-        self.temp_field.setText(self.__clean_float(self.data["temp"]["degrees"]))
-        if self.data["temp"]["unit"] == "c":
-            self.temp_c_button.setChecked(True)
-            self.__current_unit = "c"
-        else:
-            self.temp_f_button.setChecked(True)
-            self.__current_unit = "f"
-
-        # Populate Co2 fields
-        self.co2_field.setText(str(self.data["co2"]))
-
-        # Populate light fields
-        if self.data["light"]["enabled"]:
-            self.light_button.setChecked(True)
-            self.light_on_field.setEnabled(True)
-            self.light_off_field.setEnabled(True)
-        self.light_on_field.setText(self.__clean_float(self.data["light"]["on_time"]))
-        self.light_off_field.setText(self.__clean_float(self.data["light"]["off_time"]))
-
-        # Populate photo fields
-        if self.data["photo"]["enabled"]:
-            self.photo_button.setChecked(True)
-            self.photo_field.setEnabled(True)
-        self.photo_field.setText(self.__clean_float(self.data["photo"]["timer"]))
-        self.submit_button.setEnabled(True)
+        self.__populate()
 
         # Button bindings
         self.temp_c_button.clicked.connect(self.__button_use_c)
@@ -88,6 +127,51 @@ class Logic(QMainWindow, GreenhouseGUI):
         self.light_button.clicked.connect(self.__lights_clicked)
         self.photo_button.clicked.connect(self.__photo_clicked)
         self.submit_button.clicked.connect(self.__submit_clicked)
+        self.undo_button.clicked.connect(self.__undo_clicked)
+        self.redo_button.clicked.connect(self.__redo_clicked)
+        self.autosave_button.clicked.connect(self.__autosave_clicked)
+
+        # Validate each field as it is typed in
+        for path, field in self.__text_fields.items():
+            field.textEdited.connect(lambda text, path=path: self.__field_edited(path, text))
+            field.installEventFilter(self)
+
+        # Restarted on every edit, so autosave only runs once typing has paused
+        self.__autosave_timer = QtCore.QTimer(self)
+        self.__autosave_timer.setSingleShot(True)
+        self.__autosave_timer.setInterval(Logic.__AUTOSAVE_DELAY)
+        self.__autosave_timer.timeout.connect(self.__autosave)
+
+    def __populate(self) -> None:
+        """
+        Fills fields and buttons from self.data
+        :return: None
+        """
+
+        # Populate text fields, ints are shown as is and floats cleaned of trailing 0's
+        for path, field in self.__text_fields.items():
+            value = SettingsSchema.get(self.data, SETTINGS.fields[path].keys)
+            field.setText(str(value) if SETTINGS.fields[path].kind is int else self.__clean_float(value))
+            self.set_field_error(field)
+        self.__field_errors.clear()
+
+        # Populate temperature unit buttons
+        if self.data["temp"]["unit"] == "c":
+            self.temp_c_button.setChecked(True)
+            self.__current_unit = "c"
+        else:
+            self.temp_f_button.setChecked(True)
+            self.__current_unit = "f"
+
+        # Populate light / photo buttons
+        self.light_button.setChecked(self.data["light"]["enabled"])
+        self.light_on_field.setEnabled(self.data["light"]["enabled"])
+        self.light_off_field.setEnabled(self.data["light"]["enabled"])
+        self.photo_button.setChecked(self.data["photo"]["enabled"])
+        self.photo_field.setEnabled(self.data["photo"]["enabled"])
+        self.submit_button.setEnabled(not self.__read_only)
+        self.autosave_button.setEnabled(not self.__read_only)
+        self.__refresh_history_buttons()
 
     def __button_use_f(self) -> None:
         """
@@ -106,6 +190,7 @@ class Logic(QMainWindow, GreenhouseGUI):
 
         self.__current_unit = "f"
         self.temp_field.setText(f"{Logic.__clean_float(c_temp * 9 / 5 + 32)}")  # Necessary to remove trailing 0's / decimal
+        self.__mark_dirty("temp.degrees", "temp.unit")
 
     def __button_use_c(self) -> None:
         """
@@ -124,6 +209,7 @@ class Logic(QMainWindow, GreenhouseGUI):
 
         self.__current_unit = "c"
         self.temp_field.setText(f"{Logic.__clean_float((c_temp - 32) * 5 / 9)}")  # Necessary to remove trailing 0's / decimal
+        self.__mark_dirty("temp.degrees", "temp.unit")
 
     def __lights_clicked(self) -> None:
         """
@@ -137,6 +223,7 @@ class Logic(QMainWindow, GreenhouseGUI):
         else:
             self.light_on_field.setEnabled(False)
             self.light_off_field.setEnabled(False)
+        self.__mark_dirty("light.enabled")
 
     def __photo_clicked(self) -> None:
         """
@@ -148,6 +235,164 @@ class Logic(QMainWindow, GreenhouseGUI):
             self.photo_field.setEnabled(True)
         else:
             self.photo_field.setEnabled(False)
+        self.__mark_dirty("photo.enabled")
+
+    def __field_value(self, path: str):
+        """
+        Reads the raw value for a settings path from its widget
+        :param path: Dotted path of the field in the settings schema
+        :return: Field text for text fields, the selected unit or checked state otherwise
+        """
+
+        if path in self.__text_fields:
+            return self.__text_fields[path].text()
+        elif path == "temp.unit":
+            return self.__current_unit
+        elif path == "light.enabled":
+            return self.light_button.isChecked()
+        return self.photo_button.isChecked()
+
+    def __field_edited(self, path: str, text: str) -> None:
+        """
+        Validates a single field as it is edited, marking it inline if invalid
+        :param path: Dotted path of the field in the settings schema
+        :param text: New field text
+        :return: None
+        """
+
+        try:
+            SETTINGS.validate_field(path, text)
+            self.__field_errors.pop(path, None)
+            self.set_field_error(self.__text_fields[path])
+        except ValueError as e:
+            self.__field_errors[path] = str(e)
+            self.set_field_error(self.__text_fields[path], str(e))
+
+        # Show the first outstanding error, or go back to the load status or prompt once everything is valid
+        self.submit_label.setText(next(iter(self.__field_errors.values()), self.__load_status or self.PROMPT))
+
+        self.__metrics["validations"] += 1
+        self.__feedback_pending = True
+        self.__mark_dirty(path)
+
+    def eventFilter(self, watched: QtCore.QObject, event: QtCore.QEvent) -> bool:
+        """
+        Measures keystroke-to-feedback latency on the text fields, from the key press reaching a field until that
+        field is next repainted with the result of validating it. Several keys typed before a repaint are timed
+        from the first of them.
+        :param watched: Text field the event is for
+        :param event: Event about to be delivered
+        :return: False so the field still handles every event
+        """
+
+        if event.type() == QtCore.QEvent.Type.KeyPress:
+            if self.__key_pressed_at is None:
+                self.__key_pressed_at = time.perf_counter()
+        elif event.type() == QtCore.QEvent.Type.Paint:
+            # Keys that did not edit the field (i.e arrows) are dropped here without being counted
+            if self.__feedback_pending and self.__key_pressed_at is not None:
+                elapsed = time.perf_counter() - self.__key_pressed_at
+                self.__metrics["feedback_samples"] += 1
+                self.__metrics["feedback_seconds"] += elapsed
+                self.__metrics["max_feedback_seconds"] = max(self.__metrics["max_feedback_seconds"], elapsed)
+            self.__key_pressed_at = None
+            self.__feedback_pending = False
+
+        return super().eventFilter(watched, event)
+
+    def __mark_dirty(self, *paths: str) -> None:
+        """
+        Records edited settings paths and (re)starts the autosave timer, if autosave is enabled
+        :param paths: Dotted paths of the edited fields
+        :return: None
+        """
+
+        if not self.autosave_button.isChecked():
+            return
+
+        self.__dirty.update(paths)
+        self.__autosave_timer.start()
+
+    def __autosave_clicked(self) -> None:
+        """
+        Handles toggling autosave, dropping any pending edits when it is turned off
+        :return: None
+        """
+
+        if not self.autosave_button.isChecked():
+            self.__autosave_timer.stop()
+            self.__dirty.clear()
+
+    def __autosave(self) -> None:
+        """
+        Persists valid edited fields once typing has paused. Invalid fields are left for the user to fix,
+        and nothing is written unless a value actually changed. Coupled fields are saved all together or not at
+        all, so i.e degrees converted to a new unit are never saved against the old unit.
+        :return: None
+        """
+
+        for group in Logic.__COUPLED:
+            if self.__dirty.intersection(group):
+                self.__dirty.update(group)
+
+        values = {}
+        for path in self.__dirty:
+            try:
+                values[path] = SETTINGS.validate_field(path, self.__field_value(path))
+            except ValueError:
+                continue
+        for group in Logic.__COUPLED:
+            if not all(path in values for path in group):
+                for path in group:
+                    values.pop(path, None)
+        self.__dirty.clear()
+
+        data = copy.deepcopy(self.data)
+        for path, value in values.items():
+            SettingsSchema.put(data, SETTINGS.fields[path].keys, value)
+
+        if data == self.data:
+            return
+
+        self.data = data
+        self.__history.commit(self.data, "autosave")
+        self.__write_settings()
+        self.__metrics["autosaves"] += 1
+        self.__refresh_history_buttons()
+
+        if not self.__field_errors:
+            self.submit_label.setText("Greenhouse settings have been saved automatically")
+
+    def metrics(self) -> dict:
+        """
+        Gets editing session metrics: number of live validations, average and worst keystroke-to-feedback
+        time in milliseconds (key press reaching a field until it is repainted), total settings.json writes,
+        and how many of those were autosaves
+        :return: dict
+        """
+
+        samples = self.__metrics["feedback_samples"]
+        return {"validations": self.__metrics["validations"],
+                "average_feedback_ms": self.__metrics["feedback_seconds"] / samples * 1000 if samples else 0.0,
+                "max_feedback_ms": self.__metrics["max_feedback_seconds"] * 1000,
+                "writes": self.__metrics["writes"],
+                "autosaves": self.__metrics["autosaves"]}
+
+    def closeEvent(self, event: QtGui.QCloseEvent) -> None:
+        """
+        Flushes any pending autosave before closing, closes the history log, and logs the session metrics
+        :param event: Close event
+        :return: None
+        """
+
+        if self.__autosave_timer.isActive():
+            self.__autosave_timer.stop()
+            self.__autosave()
+        self.__history.close()
+
+        logger.info("Greenhouse editing session metrics: %s", self.metrics())
+
+        super().closeEvent(event)
 
     def __submit_clicked(self) -> None:
         """
@@ -155,37 +400,84 @@ class Logic(QMainWindow, GreenhouseGUI):
         :return: None
         """
 
+        raw = {}
+        for path, field in SETTINGS.fields.items():
+            SettingsSchema.put(raw, field.keys, self.__field_value(path))
+
+        # Conversion and range checks are defined once in the settings schema
         try:
-            # Try and convert all our values. Only real invalid inputs here would be
-            # strings, which would then throw a value error.
-            self.data["humidity"] = float(self.humidity_field.text())
-            self.data["co2"] = int(self.co2_field.text())
-            self.data["temp"]["degrees"] = round(float(self.temp_field.text()), 3)
-            self.data["temp"]["unit"] = self.__current_unit
-            self.data["light"]["enabled"] = self.light_button.isChecked()
-            self.data["light"]["on_time"] = round(float(self.light_on_field.text()), 3)
-            self.data["light"]["off_time"] = round(float(self.light_off_field.text()), 3)
-            self.data["photo"]["enabled"] = self.photo_button.isChecked()
-            self.data["photo"]["timer"] = round(float(self.photo_field.text()), 3)
-        except ValueError:
-            self.submit_label.setText("Incorrect values provided. Please enter all values as integers or floats (i.e \"30\" rather than \"30 minutes\")")
+            self.data = SETTINGS.validate(raw)
+        except ValueError as e:
+            self.submit_label.setText(str(e))
             return
 
-        if self.data["humidity"] < 0 or self.data["humidity"] > 100:
-            self.submit_label.setText("Please submit relative humidity value as a number between 0 and 100")
+        # Submit already saves every field, so drop any pending autosave
+        self.__autosave_timer.stop()
+        self.__dirty.clear()
+
+        self.__history.commit(self.data, "submit")
+        self.__write_settings()
+        self.__refresh_history_buttons()
+
+        self.submit_label.setText("Greenhouse settings have been successfully updated")
+
+    def __undo_clicked(self) -> None:
+        """
+        Reverts the last submitted change, writing the previous settings back to settings.json
+        :return: None
+        """
+
+        data = self.__history.undo()
+        if data is None:
             return
-        elif self.data["co2"] < 0:
-            self.submit_label.setText("Please submit a Co2 PPM value greater than 0")
+
+        self.__autosave_timer.stop()
+        self.__dirty.clear()
+        self.data = data
+        self.__write_settings()
+        self.__populate()
+        self.submit_label.setText("Last change has been undone")
+
+    def __redo_clicked(self) -> None:
+        """
+        Re-applies the last undone change, writing it back to settings.json
+        :return: None
+        """
+
+        data = self.__history.redo()
+        if data is None:
             return
-        elif self.data["light"]["on_time"] < 0 or self.data["light"]["off_time"] < 0 or self.data["photo"]["timer"] < 0:
-            self.submit_label.setText("Please enter time values greater than 0")
+
+        self.__autosave_timer.stop()
+        self.__dirty.clear()
+        self.data = data
+        self.__write_settings()
+        self.__populate()
+        self.submit_label.setText("Last undone change has been redone")
+
+    def __refresh_history_buttons(self) -> None:
+        """
+        Enables the undo / redo buttons only when there is something to undo / redo and settings are writable
+        :return: None
+        """
+
+        self.undo_button.setEnabled(self.__history.can_undo() and not self.__read_only)
+        self.redo_button.setEnabled(self.__history.can_redo() and not self.__read_only)
+
+    def __write_settings(self) -> None:
+        """
+        Overwrites settings file with self.data
+        :return: None
+        """
+
+        # Safety net, every path that saves is already disabled while read-only
+        if self.__read_only:
             return
 
-        # Overwrite settings file with new data
-        with open("settings.json", "w", encoding='utf-8') as settings:
+        with open(self.__settings_path, "w", encoding='utf-8') as settings:
             json.dump(self.data, settings, indent=4)
-
-        self.submit_label.setText("Greenhouse settings have been successfully updated")
+        self.__metrics["writes"] += 1
+        self.__load_status = None
 
     @staticmethod
     def __clean_float(n: float) -> str:
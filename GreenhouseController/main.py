@@ -3,6 +3,7 @@ from logic import *
 
 def main():
     application = QApplication([])
+    application.setStyleSheet(STYLESHEET)
 
     # Need to explicitly pass window size to Logic class in order to position widgets that are relative to the window size
     # No matter what order setFixedSize and window.geometry.width() are called in, the latter is not updated
@@ -0,0 +1,410 @@
+import argparse
+import json
+import math
+import timeit
+
+
+def _convert_bool(value) -> bool:
+    """
+    Coerces a JSON boolean or its text form, rejecting anything else rather than using truthiness
+    :param value: Raw value
+    :return: bool
+    """
+
+    if value is True or value in ("true", "True"):
+        return True
+    if value is False or value in ("false", "False"):
+        return False
+    raise ValueError(value)
+
+
+def _convert_int(value) -> int:
+    """
+    Coerces a whole number or its text form, rejecting booleans and fractional floats rather than
+    silently truncating them
+    :param value: Raw value
+    :return: int
+    """
+
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(value)
+    return int(value)
+
+
+def _compile_float(digits: int):
+    """
+    Builds a float converter that rejects booleans, infinity, and NaN, rounding to digits if given
+    :param digits: Number of digits to round to, or None
+    :return: Function taking a raw value and returning a float
+    """
+
+    def convert(value) -> float:
+        if isinstance(value, bool):
+            raise ValueError(value)
+        value = float(value)
+        if not math.isfinite(value):
+            raise ValueError(value)
+        return value if digits is None else round(value, digits)
+
+    return convert
+
+
+def _convert_str(value) -> str:
+    """
+    Accepts only str values so numbers are not silently turned into e.g. a temperature unit
+    :param value: Raw value
+    :return: str
+    """
+
+    if not isinstance(value, str):
+        raise ValueError(value)
+    return value
+
+
+class UnsupportedVersionError(ValueError):
+    """
+    Raised for settings written by a newer (or unknown) version of the app, which cannot be migrated
+    and must not be overwritten
+    """
+
+
+class Field:
+    """
+    Declarative description of a single settings value. Fields are addressed by a dotted
+    path (i.e "temp.degrees") that mirrors the nesting of settings.json.
+    """
+
+    def __init__(self, path: str, kind: type, default, minimum: float = None, maximum: float = None,
+                 choices: tuple = None, digits: int = None, error: str = None):
+        """
+        :param path: Dotted path of the value inside the settings dict
+        :param kind: Type the value is coerced to (float, int, bool, or str)
+        :param default: Value used for new files and for keys missing from old files
+        :param minimum: Inclusive lower bound, if any
+        :param maximum: Inclusive upper bound, if any
+        :param choices: Tuple of allowed values, if any
+        :param digits: Number of digits to round floats to, if any
+        :param error: Message used when the value is out of bounds
+        """
+
+        self.path = path
+        self.keys = tuple(path.split("."))
+        self.kind = kind
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.choices = choices
+        self.digits = digits
+        self.error = error
+
+
+class SettingsSchema:
+    """
+    Compiles a list of Fields once into per-field converter and checker closures, so no field definitions
+    are looked up while validating.
+    """
+
+    CONVERSION_ERRORS = (KeyError, TypeError, ValueError, OverflowError)
+    CONVERSION_ERROR = "Incorrect values provided. Please enter all values as integers or floats (i.e \"30\" rather than \"30 minutes\")"
+
+    def __init__(self, fields: list, version: int, migrations: dict):
+        """
+        :param fields: List of Field objects, checks are run in this order
+        :param version: Current settings file version, stored under the "version" key
+        :param migrations: Dict of version -> function upgrading a dict from that version to the next
+        """
+
+        self.fields = {field.path: field for field in fields}
+        self.version = version
+        self.__migrations = migrations
+        self.__converters = {field.path: SettingsSchema.__compile_converter(field) for field in fields}
+        self.__checkers = {field.path: SettingsSchema.__compile_checker(field) for field in fields}
+        self.__compiled = [(field.keys, self.__converters[field.path], self.__checkers[field.path]) for field in fields]
+
+    @staticmethod
+    def __compile_converter(field: Field):
+        """
+        Builds the function that coerces a raw value (JSON value or field text) to the field type
+        :param field: Field to compile
+        :return: Function taking a raw value and returning the coerced value, raising ValueError on failure
+        """
+
+        if field.kind is bool:
+            return _convert_bool
+        if field.kind is str:
+            return _convert_str
+        if field.kind is int:
+            return _convert_int
+        return _compile_float(field.digits)
+
+    @staticmethod
+    def __compile_checker(field: Field):
+        """
+        Builds the function that checks a coerced value against the field bounds
+        :param field: Field to compile
+        :return: Function taking a coerced value and returning an error message, or None if valid
+        """
+
+        minimum, maximum, choices, error = field.minimum, field.maximum, field.choices, field.error
+
+        if choices is not None:
+            return lambda value: None if value in choices else error
+        if minimum is not None and maximum is not None:
+            return lambda value: None if minimum <= value <= maximum else error
+        if minimum is not None:
+            return lambda value: None if value >= minimum else error
+        if maximum is not None:
+            return lambda value: None if value <= maximum else error
+        return lambda value: None
+
+    def validate(self, raw: dict) -> dict:
+        """
+        Strictly coerces and checks a whole settings dict. All fields are converted before any bounds are
+        checked, so a non-numerical value is always reported before an out of range one.
+        :param raw: Settings dict of JSON values or field text
+        :return: New, cleaned settings dict, raises ValueError with a user facing message if anything is invalid
+        """
+
+        try:
+            values = [convert(SettingsSchema.get(raw, keys)) for keys, convert, __ in self.__compiled]
+        except SettingsSchema.CONVERSION_ERRORS:
+            raise ValueError(SettingsSchema.CONVERSION_ERROR)
+
+        clean = {"version": self.version}
+        for (keys, __, check), value in zip(self.__compiled, values):
+            error = check(value)
+            if error is not None:
+                raise ValueError(error)
+            SettingsSchema.put(clean, keys, value)
+        return clean
+
+    @staticmethod
+    def get(data: dict, keys: tuple):
+        """
+        Reads a nested value from a settings dict
+        :param data: Settings dict
+        :param keys: Tuple of keys making up the path
+        :return: Value at path, raises KeyError / TypeError if missing
+        """
+
+        for key in keys:
+            data = data[key]
+        return data
+
+    @staticmethod
+    def put(data: dict, keys: tuple, value) -> None:
+        """
+        Writes a nested value into a settings dict, creating intermediate dicts as needed
+        :param data: Settings dict
+        :param keys: Tuple of keys making up the path
+        :param value: Value to write
+        :return: None
+        """
+
+        for key in keys[:-1]:
+            data = data.setdefault(key, {})
+        data[keys[-1]] = value
+
+    def defaults(self) -> dict:
+        """
+        Builds a fresh settings dict filled with every field's default
+        :return: dict
+        """
+
+        data = {"version": self.version}
+        for field in self.fields.values():
+            SettingsSchema.put(data, field.keys, field.default)
+        return data
+
+    def validate_field(self, path: str, raw):
+        """
+        Coerces and checks a single field
+        :param path: Dotted path of the field
+        :param raw: Raw value or field text
+        :return: Coerced value, raises ValueError with a user facing message if invalid
+        """
+
+        try:
+            value = self.__converters[path](raw)
+        except SettingsSchema.CONVERSION_ERRORS:
+            raise ValueError(SettingsSchema.CONVERSION_ERROR)
+
+        error = self.__checkers[path](value)
+        if error is not None:
+            raise ValueError(error)
+        return value
+
+    def migrate(self, data: dict) -> dict:
+        """
+        Upgrades a settings dict from whatever version it was written with to the current version.
+        Files written before versioning existed have no "version" key and are treated as version 0.
+        :param data: Settings dict as read from disk
+        :return: Upgraded settings dict
+        """
+
+        version = data.get("version", 0)
+        if not isinstance(version, int) or isinstance(version, bool) or version < 0 or version > self.version:
+            raise UnsupportedVersionError(f"Settings file version {version!r} is not supported by this version of the app")
+
+        while version < self.version:
+            data = self.__migrations[version](data)
+            version += 1
+            data["version"] = version
+        return data
+
+    def load(self, data: dict) -> tuple:
+        """
+        Migrates a settings dict and coerces it leniently. Keys missing from older files are filled in
+        with their defaults, and values that are present but invalid are also reset to their defaults and
+        reported so the caller can tell the user rather than discarding the whole file.
+        :param data: Settings dict as read from disk
+        :return: Tuple of (cleaned settings dict, list of paths whose invalid values were reset)
+        """
+
+        data = self.migrate(data)
+        clean = {"version": self.version}
+        reset = []
+        for field in self.fields.values():
+            try:
+                value = self.validate_field(field.path, SettingsSchema.get(data, field.keys))
+            except KeyError:
+                value = field.default
+            except (TypeError, ValueError, OverflowError):
+                value = field.default
+                reset.append(field.path)
+            SettingsSchema.put(clean, field.keys, value)
+        return clean, reset
+
+
+def _migrate_v0(data: dict) -> dict:
+    """
+    Version 0 files were written by the original hand-written loader and may be missing keys
+    or whole sections. SettingsSchema.load fills those in from defaults, so only the sections
+    need to be made dicts here.
+    :param data: Version 0 settings dict
+    :return: Version 1 settings dict
+    """
+
+    for section in ("temp", "light", "photo"):
+        if not isinstance(data.get(section), dict):
+            data[section] = {}
+    return data
+
+
+SETTINGS = SettingsSchema([
+    Field("humidity", float, 0.0, minimum=0, maximum=100,
+          error="Please submit relative humidity value as a number between 0 and 100"),
+    Field("co2", int, 0, minimum=0, error="Please submit a Co2 PPM value greater than 0"),
+    Field("temp.degrees", float, 0.0, digits=3),
+    Field("temp.unit", str, "f", choices=("c", "f"), error="Please select a temperature unit"),
+    Field("light.enabled", bool, False),
+    Field("light.on_time", float, 0.0, minimum=0, digits=3, error="Please enter time values greater than 0"),
+    Field("light.off_time", float, 0.0, minimum=0, digits=3, error="Please enter time values greater than 0"),
+    Field("photo.enabled", bool, False),
+    Field("photo.timer", float, 0.0, minimum=0, digits=3, error="Please enter time values greater than 0"),
+], version=1, migrations={0: _migrate_v0})
+
+
+def _legacy_validate(raw: dict) -> dict:
+    """
+    The hand-written validation previously used by Logic, kept only as a benchmark baseline. The unit and
+    enabled values came straight from widgets there and were never checked, so the same checks the schema
+    does are added here to keep the comparison fair.
+    :param raw: Settings dict of field text
+    :return: Cleaned settings dict
+    """
+
+    data = {"temp": {}, "light": {}, "photo": {}}
+    data["humidity"] = float(raw["humidity"])
+    data["co2"] = int(raw["co2"])
+    data["temp"]["degrees"] = round(float(raw["temp"]["degrees"]), 3)
+    data["temp"]["unit"] = raw["temp"]["unit"]
+    data["light"]["enabled"] = raw["light"]["enabled"]
+    data["light"]["on_time"] = round(float(raw["light"]["on_time"]), 3)
+    data["light"]["off_time"] = round(float(raw["light"]["off_time"]), 3)
+    data["photo"]["enabled"] = raw["photo"]["enabled"]
+    data["photo"]["timer"] = round(float(raw["photo"]["timer"]), 3)
+    if data["temp"]["unit"] not in ("c", "f"):
+        raise ValueError("unit")
+    if not isinstance(data["light"]["enabled"], bool) or not isinstance(data["photo"]["enabled"], bool):
+        raise ValueError("enabled")
+
+    if data["humidity"] < 0 or data["humidity"] > 100:
+        raise ValueError("humidity")
+    elif data["co2"] < 0:
+        raise ValueError("co2")
+    elif data["light"]["on_time"] < 0 or data["light"]["off_time"] < 0 or data["photo"]["timer"] < 0:
+        raise ValueError("time")
+    return data
+
+
+def benchmark(number: int = 50000, rounds: int = 5) -> None:
+    """
+    Prints validation throughput of the schema against the old hand-written path. The two are
+    timed alternately over several rounds and the best round of each is kept, so background load on the
+    machine affects both equally.
+    :param number: Number of validations per timing
+    :param rounds: Number of alternating rounds
+    :return: None
+    """
+
+    raw = {"humidity": "55.5", "co2": "800",
+           "temp": {"degrees": "72.25", "unit": "f"},
+           "light": {"enabled": True, "on_time": "6", "off_time": "20.5"},
+           "photo": {"enabled": False, "timer": "15"}}
+
+    functions = {"hand-written": _legacy_validate, "schema": SETTINGS.validate}
+    best = {name: float("inf") for name in functions}
+    for __ in range(rounds):
+        for name, function in functions.items():
+            best[name] = min(best[name], min(timeit.repeat(lambda: function(raw), number=number, repeat=3)))
+
+    for name, seconds in best.items():
+        print(f"{name:>16}: {number / seconds:>12,.0f} validations/s ({seconds / number * 1e6:.2f} us each)")
+    print(f"{'speedup':>16}: {best['hand-written'] / best['schema']:.2f}x")
+
+
+def main() -> None:
+    """
+    Batch tool for checking and upgrading settings files without opening the GUI
+    :return: None
+    """
+
+    parser = argparse.ArgumentParser(description="Validate and upgrade greenhouse settings files")
+    parser.add_argument("files", nargs="*", help="settings.json files to check")
+    parser.add_argument("--write", action="store_true", help="rewrite files upgraded to the current version")
+    parser.add_argument("--bench", action="store_true", help="benchmark validation throughput")
+    args = parser.parse_args()
+
+    for path in args.files:
+        with open(path, encoding='utf-8') as settings:
+            try:
+                original = json.load(settings, strict=False)
+            except json.JSONDecodeError as e:
+                print(f"{path}: unreadable ({e})")
+                continue
+
+        if not isinstance(original, dict):
+            print(f"{path}: unreadable (expected a JSON object, got {type(original).__name__})")
+            continue
+
+        try:
+            data, reset = SETTINGS.load(dict(original))
+        except UnsupportedVersionError as e:
+            print(f"{path}: skipped ({e})")
+            continue
+
+        status = "ok" if data == original else f"upgraded from version {original.get('version', 0)}"
+        if reset:
+            status += f", invalid values reset to defaults: {', '.join(reset)}"
+        print(f"{path}: {status}")
+        if args.write and data != original:
+            with open(path, "w", encoding='utf-8') as settings:
+                json.dump(data, settings, indent=4)
+
+    if args.bench:
+        benchmark()
+
+
+if __name__ == "__main__":
+    main()
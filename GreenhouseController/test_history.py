@@ -0,0 +1,191 @@
+import json
+import os
+import pytest
+from history import RevisionStack, SettingsHistory
+from settings import SETTINGS
+
+
+def settings(co2: int) -> dict:
+    """
+    :param co2: Co2 value to set
+    :return: Default settings dict with co2 changed
+    """
+
+    data = SETTINGS.defaults()
+    data["co2"] = co2
+    return data
+
+
+@pytest.fixture
+def log(tmp_path):
+    return str(tmp_path / "history.jsonl")
+
+
+def test_at_across_chunks(log):
+    history = SettingsHistory(log, checkpoint_interval=4)
+    for co2 in range(11):
+        history.commit(settings(co2))
+
+    assert len(history) == 11
+    assert [history.at(revision)["co2"] for revision in range(11)] == list(range(11))
+    assert history.at(-1) == history.head() == settings(10)
+    with pytest.raises(IndexError):
+        history.at(11)
+
+
+def test_reopen_loads_packed_chunks_and_tail(log):
+    history = SettingsHistory(log, checkpoint_interval=4)
+    for co2 in range(11):
+        history.commit(settings(co2))
+
+    # Two chunks packed, only the three unpacked revisions stay in the log
+    with open(log, encoding='utf-8') as file:
+        assert len(file.read().splitlines()) == 3
+
+    reopened = SettingsHistory(log, checkpoint_interval=100)
+    assert len(reopened) == 11
+    assert [reopened.at(revision)["co2"] for revision in range(11)] == list(range(11))
+    assert [reopened.entry(revision) for revision in range(11)] == [history.entry(revision) for revision in range(11)]
+
+
+def test_as_of(log, monkeypatch):
+    clock = iter(range(100, 200, 10))
+    monkeypatch.setattr("history.time.time", lambda: next(clock))
+
+    history = SettingsHistory(log, checkpoint_interval=4)
+    for co2 in range(10):
+        history.commit(settings(co2))  # Revision n is at time 100 + 10n
+
+    assert history.as_of(99) is None
+    assert history.as_of(100)["co2"] == 0
+    assert history.as_of(135)["co2"] == 3  # Last revision of the first chunk
+    assert history.as_of(140)["co2"] == 4  # First revision of the second chunk
+    assert history.as_of(185)["co2"] == 8  # Unpacked tail
+    assert history.as_of(1000)["co2"] == 9
+
+
+def test_undo_redo(log):
+    history = SettingsHistory(log, checkpoint_interval=4)
+    history.commit(settings(0), "load")
+    for co2 in (1, 2, 3):
+        history.commit(settings(co2))
+
+    assert history.undo()["co2"] == 2
+    assert history.undo()["co2"] == 1
+    assert history.redo()["co2"] == 2
+    assert history.undo()["co2"] == 1
+    assert history.undo()["co2"] == 0
+    assert not history.can_undo()  # The initial load is not undoable
+    assert history.undo() is None
+
+    history.commit(settings(5))
+    assert not history.can_redo()
+    assert history.undo()["co2"] == 0
+
+    reopened = SettingsHistory(log)
+    assert reopened.head() == history.head()
+    assert reopened.can_undo() == history.can_undo()
+    assert reopened.redo()["co2"] == 5
+
+
+def test_truncated_line_does_not_swallow_next_record(log):
+    history = SettingsHistory(log, checkpoint_interval=64)
+    history.commit(settings(1))
+    history.commit(settings(2))
+    with open(log, "a", encoding='utf-8') as file:
+        file.write('{"revision": 2, "time": 1, "chan')  # Cut off by a crash
+
+    reopened = SettingsHistory(log, checkpoint_interval=64)
+    reopened.commit(settings(99))
+
+    again = SettingsHistory(log, checkpoint_interval=64)
+    assert again.head()["co2"] == 99
+    assert len(again) == 3
+
+
+def test_lost_revision_keeps_numbering_and_replays_undo(log):
+    history = SettingsHistory(log, checkpoint_interval=64)
+    history.commit(settings(0), "load")
+    history.commit(settings(1))
+    history.commit(settings(2))
+    history.undo()  # Revision 3 undoes revision 2
+    history.commit(settings(4))
+
+    # Drop the undone submit, as if its line had been corrupted
+    with open(log, encoding='utf-8') as file:
+        lines = file.read().splitlines(keepends=True)
+    with open(log, "w", encoding='utf-8') as file:
+        file.writelines(lines[:2] + lines[3:])
+
+    reopened = SettingsHistory(log, checkpoint_interval=64)
+    assert len(reopened) == 5
+    assert reopened.entry(2)["action"] == "lost"
+    assert reopened.entry(3) == history.entry(3)
+    assert reopened.head() == history.head()
+    assert reopened.undo()["co2"] == 1
+
+
+def test_legacy_log_without_revision_numbers_is_packed(log):
+    with open(log, "w", encoding='utf-8') as file:
+        for co2 in range(10):
+            old = None if co2 == 0 else co2 - 1
+            file.write(json.dumps({"time": co2, "author": "a", "action": "submit", "target": None,
+                                   "changes": {"co2": [old, co2]}}) + "\n")
+
+    history = SettingsHistory(log, checkpoint_interval=4)
+    assert len(history) == 10
+    assert [history.at(revision)["co2"] for revision in range(10)] == list(range(10))
+    with open(log, encoding='utf-8') as file:
+        assert [json.loads(line)["revision"] for line in file] == [8, 9]
+
+
+def test_revision_stack_runs():
+    stack = RevisionStack()
+    for revision in (0, 1, 2, 3, 7, 8):
+        stack.push(revision)
+    assert stack.runs == [[0, 3], [7, 8]]
+
+    stack.discard(2)
+    assert stack.runs == [[0, 1], [3, 3], [7, 8]]
+    assert 2 not in stack and 3 in stack
+    stack.discard(8)
+    stack.discard(7)
+    assert stack.top() == 3
+    stack.discard(42)
+    assert stack.runs == [[0, 1], [3, 3]]
+
+
+def test_interrupted_pack_is_redone_on_reopen(log, monkeypatch):
+    history = SettingsHistory(log, checkpoint_interval=4)
+    for co2 in range(7):
+        history.commit(settings(co2))
+
+    def crash(*args):
+        raise OSError("crash")
+
+    # The second chunk's frame and record are written, but the index is never replaced
+    monkeypatch.setattr("history.os.replace", crash)
+    with pytest.raises(OSError):
+        history.commit(settings(7))
+    history.close()
+    monkeypatch.undo()
+
+    reopened = SettingsHistory(log, checkpoint_interval=4)
+    assert len(reopened) == 8
+    reopened.commit(settings(8))
+    assert [reopened.at(revision)["co2"] for revision in range(9)] == list(range(9))
+
+    again = SettingsHistory(log)
+    assert [again.at(revision)["co2"] for revision in range(9)] == list(range(9))
+
+
+def test_index_does_not_grow_with_history(log):
+    history = SettingsHistory(log, checkpoint_interval=4)
+    sizes = []
+    for co2 in range(400):
+        history.commit(settings(co2))
+        if co2 in (7, 399):
+            sizes.append(os.path.getsize(log + ".index"))
+
+    assert sizes[1] - sizes[0] < 16
+    assert os.path.getsize(log + ".chunks") == 100 * 20
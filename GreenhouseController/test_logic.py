@@ -0,0 +1,88 @@
+import json
+import os
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtTest = pytest.importorskip("PyQt6.QtTest")
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication
+from logic import Logic
+
+
+@pytest.fixture
+def window(tmp_path, monkeypatch):
+    application = QApplication.instance() or QApplication([])
+    monkeypatch.setattr(Logic, "_Logic__AUTOSAVE_DELAY", 10)
+    windows = []
+
+    def open_window(settings: dict = None) -> Logic:
+        if settings is not None:
+            with open(tmp_path / "settings.json", "w", encoding='utf-8') as file:
+                json.dump(settings, file)
+        windows.append(Logic(550, 250, settings_dir=str(tmp_path)))
+        return windows[-1]
+
+    yield open_window
+    for opened in windows:
+        opened.close()
+    application.processEvents()
+
+
+def saved(settings_dir) -> dict:
+    """
+    :param settings_dir: Directory the window was opened with
+    :return: Settings dict currently in its settings.json
+    """
+
+    with open(settings_dir / "settings.json", encoding='utf-8') as file:
+        return json.load(file)
+
+
+def type_into(field, text: str) -> None:
+    """
+    Types text at the end of a field and waits long enough for autosave to run
+    :param field: QLineEdit to type into
+    :param text: Text to type
+    :return: None
+    """
+
+    field.end(False)
+    QtTest.QTest.keyClicks(field, text)
+    QtTest.QTest.qWait(100)
+
+
+def test_autosave_never_saves_converted_degrees_without_their_unit(window, tmp_path):
+    greenhouse = window()
+    greenhouse.temp_field.setText("72")
+    greenhouse.submit_button.click()
+    greenhouse.autosave_button.click()
+
+    greenhouse.temp_c_button.click()
+    assert greenhouse.temp_field.text() == "22.22"
+    type_into(greenhouse.temp_field, "x")  # Within the autosave delay, degrees are now invalid
+    assert saved(tmp_path)["temp"] == {"degrees": 72.0, "unit": "f"}
+
+    QtTest.QTest.keyClick(greenhouse.temp_field, Qt.Key.Key_Backspace)
+    QtTest.QTest.qWait(100)
+    assert saved(tmp_path)["temp"] == {"degrees": 22.22, "unit": "c"}
+
+
+def test_reset_notice_stays_while_typing_until_saved(window):
+    greenhouse = window({"version": 1, "co2": -5})
+    assert "reset to defaults: co2" in greenhouse.submit_label.text()
+
+    type_into(greenhouse.humidity_field, "5")
+    assert "reset to defaults: co2" in greenhouse.submit_label.text()
+
+    greenhouse.submit_button.click()
+    type_into(greenhouse.humidity_field, "0")
+    assert greenhouse.submit_label.text() == greenhouse.PROMPT
+
+
+def test_read_only_notice_stays_while_typing(window, tmp_path):
+    greenhouse = window({"version": 99, "co2": 5})
+    assert greenhouse.submit_label.text().endswith("Settings are read-only")
+
+    type_into(greenhouse.co2_field, "1")
+    assert greenhouse.submit_label.text().endswith("Settings are read-only")
+    assert saved(tmp_path) == {"version": 99, "co2": 5}
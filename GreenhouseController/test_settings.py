@@ -0,0 +1,120 @@
+import json
+import pytest
+from settings import SETTINGS, UnsupportedVersionError
+
+
+def text(data: dict) -> dict:
+    """
+    :param data: Settings dict
+    :return: Copy of data with every number turned into field text, as Logic passes it to validate
+    """
+
+    return {key: text(value) if isinstance(value, dict) else value if isinstance(value, (bool, str)) else str(value)
+            for key, value in data.items() if key != "version"}
+
+
+def test_migrate_v0_fills_missing_sections_and_keys():
+    data, reset = SETTINGS.load({"humidity": 40, "temp": {"degrees": 70}, "light": None})
+
+    expected = SETTINGS.defaults()
+    expected["humidity"] = 40.0
+    expected["temp"]["degrees"] = 70.0
+    assert data == expected
+    assert reset == []
+
+
+def test_migrate_current_version_is_unchanged():
+    data = SETTINGS.defaults()
+    assert SETTINGS.migrate(dict(data)) == data
+
+
+@pytest.mark.parametrize("version", [SETTINGS.version + 1, -1, True, "1", 1.0, None])
+def test_migrate_rejects_unsupported_versions(version):
+    with pytest.raises(UnsupportedVersionError):
+        SETTINGS.migrate({**SETTINGS.defaults(), "version": version})
+
+
+def test_load_resets_and_reports_invalid_values():
+    data = SETTINGS.defaults()
+    data["humidity"] = 150
+    data["temp"]["unit"] = 1
+    data["light"]["enabled"] = "yes"
+    del data["photo"]["timer"]  # Missing keys are filled in without being reported
+
+    clean, reset = SETTINGS.load(data)
+    assert clean == SETTINGS.defaults()
+    assert reset == ["humidity", "temp.unit", "light.enabled"]
+
+
+@pytest.mark.parametrize("value", ["Infinity", "-Infinity", "NaN", "1e400", "true", "800.7", "\"800 ppm\""])
+def test_load_resets_values_json_accepts_but_co2_does_not(value):
+    data = json.loads(f'{{"version": 1, "co2": {value}}}')
+
+    clean, reset = SETTINGS.load(data)
+    assert clean["co2"] == 0
+    assert reset == ["co2"]
+
+
+def test_load_keeps_whole_float_co2():
+    clean, reset = SETTINGS.load({"version": 1, "co2": 800.0})
+    assert clean["co2"] == 800 and isinstance(clean["co2"], int)
+    assert reset == []
+
+
+def test_load_resets_non_finite_floats():
+    clean, reset = SETTINGS.load(json.loads('{"version": 1, "temp": {"degrees": Infinity}, "photo": {"timer": NaN}}'))
+    assert clean["temp"]["degrees"] == 0.0 and clean["photo"]["timer"] == 0.0
+    assert reset == ["temp.degrees", "photo.timer"]
+
+
+def test_validate_matches_validate_field():
+    data = SETTINGS.defaults()
+    data["humidity"] = 55.5
+    data["co2"] = 800
+    data["temp"] = {"degrees": 72.1234, "unit": "c"}
+    data["light"] = {"enabled": True, "on_time": 6, "off_time": 20.5}
+
+    clean = SETTINGS.validate(text(data))
+    for path, field in SETTINGS.fields.items():
+        raw = text(data)
+        for key in field.keys:
+            raw = raw[key]
+        value = clean
+        for key in field.keys:
+            value = value[key]
+        assert value == SETTINGS.validate_field(path, raw)
+    assert clean["version"] == SETTINGS.version
+    assert clean["temp"]["degrees"] == 72.123
+
+
+@pytest.mark.parametrize("path, raw", [("humidity", "101"), ("co2", "-1"), ("co2", "1.5"), ("light.on_time", "-2"),
+                                       ("temp.degrees", "hot"), ("temp.unit", "k"), ("photo.enabled", "maybe")])
+def test_validate_and_validate_field_reject_the_same_values(path, raw):
+    data = text(SETTINGS.defaults())
+    node = data
+    for key in SETTINGS.fields[path].keys[:-1]:
+        node = node[key]
+    node[SETTINGS.fields[path].keys[-1]] = raw
+
+    with pytest.raises(ValueError) as whole:
+        SETTINGS.validate(data)
+    with pytest.raises(ValueError) as single:
+        SETTINGS.validate_field(path, raw)
+    assert str(whole.value) == str(single.value)
+
+
+def test_validate_reports_conversion_errors_before_bounds():
+    data = text(SETTINGS.defaults())
+    data["humidity"] = "150"
+    data["photo"]["timer"] = "soon"
+
+    with pytest.raises(ValueError, match="Incorrect values"):
+        SETTINGS.validate(data)
+
+
+def test_validate_rejects_missing_keys():
+    data = text(SETTINGS.defaults())
+    del data["light"]
+
+    with pytest.raises(ValueError, match="Incorrect values"):
+        SETTINGS.validate(data)
@@ -8,7 +8,10 @@ class RemoteGUI:
     the state of the TV even if the window is closed.
     """
 
-    __main_font = QtGui.QFont("Times", 11)
+    STYLESHEET = """
+        #remote, #remote * { background-color: dimgray; }
+        #remote QPushButton { font: 11pt "Times"; background-color: grey; }
+    """
 
     def __init__(self):
         """
@@ -33,7 +36,7 @@ class RemoteGUI:
         :return: None
         """
 
-        main_window.setStyleSheet("background-color: dimgray;")
+        main_window.setObjectName("remote")
 
         self.power_button = QtWidgets.QPushButton("POWER", main_window)
         self.power_button.setFixedSize(75, 25)
@@ -75,14 +78,6 @@ class RemoteGUI:
         self.mute_button.setFixedSize(20, 20)
         self.mute_button.move(width - 20, 180)
 
-        # Adding all our buttons to a list in order to do identical formatting to all of them cleanly
-        buttons = [self.power_button, self.new_tv_button, self.channel_up_button, self.channel_down_button,
-                   left, select, right, self.volume_up_button, self.volume_down_button, self.mute_button]
-        for button in buttons:
-            if button:
-                button.setFont(RemoteGUI.__main_font)
-                button.setStyleSheet("background-color: grey;")
-
 
 class TvWindow(QtWidgets.QWidget):
     """
@@ -90,7 +85,9 @@ class TvWindow(QtWidgets.QWidget):
     Will automatically update on button presses, as well as import the tv state when initialized
     """
 
-    __main_font = QtGui.QFont("Times", 13)
+    STYLESHEET = """
+        #tv QLabel { font: 13pt "Times"; color: yellow; }
+    """
 
     def __init__(self):
         """
@@ -109,22 +106,23 @@ class TvWindow(QtWidgets.QWidget):
         :return: None
         """
 
+        self.setObjectName("tv")
+
         self.power_label = QtWidgets.QLabel("OFF", self)
         self.power_label.setFixedWidth(100)
         self.power_label.move(width // 2 - 50, 0)
         self.power_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
-        self.power_label.setFont(TvWindow.__main_font)
-        self.power_label.setStyleSheet("color: yellow;")
 
         self.channel_label = QtWidgets.QLabel("CHANNEL", self)
         self.channel_label.setFixedWidth(150)
         self.channel_label.move(3, 0)
-        self.channel_label.setFont(TvWindow.__main_font)
-        self.channel_label.setStyleSheet("color: yellow;")
 
         self.volume_label = QtWidgets.QLabel("VOLUME", self)
         self.volume_label.setFixedWidth(100)
         self.volume_label.move(width - 103, 0)
         self.volume_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignRight)
-        self.volume_label.setFont(TvWindow.__main_font)
-        self.volume_label.setStyleSheet("color: yellow;")
+
+
+# Styles for every window of the app, set once on the QApplication by main.py or the launcher so they are
+# parsed once and shared by every window
+STYLESHEET = RemoteGUI.STYLESHEET + TvWindow.STYLESHEET
@@ -3,6 +3,7 @@ from logic import *
 
 def main():
     application = QApplication([])
+    application.setStyleSheet(STYLESHEET)
     # Same as with the other project, it makes sense for dynamic placement to pass in
     # our width / height and set the window size inside Logic
     remote = Logic(225, 250)
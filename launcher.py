@@ -0,0 +1,295 @@
+import argparse
+import importlib
+import json
+import os
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+from PyQt6 import QtWidgets, QtCore
+
+try:
+    import resource
+except ImportError:  # Not available on Windows, memory is then left out of the report
+    resource = None
+
+
+class Launcher(QtWidgets.QMainWindow):
+    """
+    Hosts the TV remote and greenhouse controller in a single QApplication, so Qt startup, the font database,
+    and style setup are paid for once. Each app's STYLESHEET, holding its fonts and colours, is added to the
+    application stylesheet when the app is loaded, so they are parsed once and shared by every window. Windows can either be built when first opened, or
+    pre-built hidden in standby mode so that opening one only has to show it.
+    """
+
+    ROOT = os.path.dirname(os.path.abspath(__file__))
+    APPS = {"tv": {"directory": "TVRemote", "title": "TV Remote", "size": (225, 250), "settings": False},
+            "greenhouse": {"directory": "GreenhouseController", "title": "Greenhouse Control", "size": (550, 250), "settings": True}}
+    STYLESHEET = """
+        #launcher, #launcher * { background-color: lavender; }
+    """
+
+    def __init__(self, standby: bool = False, settings_dir: str = "."):
+        """
+        :param standby: Pre-build every app window hidden so opening one is near instant
+        :param settings_dir: Directory apps that keep settings read and write them in
+        """
+
+        super().__init__()
+
+        self.__modules = {}
+        self.__windows = {}
+        self.__settings_dir = settings_dir
+
+        self.setupUI()
+
+        if standby:
+            for name in Launcher.APPS:
+                self.__build(name)
+
+    def setupUI(self) -> None:
+        """
+        Generates one button per app for opening its window
+        :return: None
+        """
+
+        self.setWindowTitle("Launcher")
+        self.setObjectName("launcher")
+        Launcher.__install_stylesheet(Launcher.STYLESHEET)
+        self.setFixedSize(200, 40 * len(Launcher.APPS) + 10)
+
+        for index, (name, app) in enumerate(Launcher.APPS.items()):
+            button = QtWidgets.QPushButton(app["title"], self)
+            button.setFixedSize(180, 30)
+            button.move(10, 10 + 40 * index)
+            button.clicked.connect(lambda checked, name=name: self.open(name))
+
+    @staticmethod
+    def __install_stylesheet(stylesheet: str) -> None:
+        """
+        Adds a stylesheet to the application's, once
+        :param stylesheet: Stylesheet to add
+        :return: None
+        """
+
+        application = QtWidgets.QApplication.instance()
+        if stylesheet not in application.styleSheet():
+            application.setStyleSheet(application.styleSheet() + stylesheet)
+
+    def __load(self, name: str):
+        """
+        Imports an app's logic module. Both apps use the same top level module names (gui, logic) and import
+        each other with star imports, so each app is imported with its own folder first on the path, and every
+        module it loaded from that folder is then moved out of the way under "<app>.<module>" before the next
+        app is imported. The app's stylesheet is installed along with it.
+        :param name: Key of the app in APPS
+        :return: The app's logic module
+        """
+
+        if name in self.__modules:
+            return self.__modules[name]
+
+        directory = os.path.join(Launcher.ROOT, Launcher.APPS[name]["directory"])
+        loaded = set(sys.modules)
+        sys.path.insert(0, directory)
+        try:
+            module = importlib.import_module("logic")
+        finally:
+            sys.path.remove(directory)
+            for module_name in set(sys.modules) - loaded:
+                module_file = getattr(sys.modules[module_name], "__file__", None)
+                if module_file is not None and os.path.dirname(os.path.abspath(module_file)) == directory:
+                    sys.modules[f"{name}.{module_name}"] = sys.modules.pop(module_name)
+
+        Launcher.__install_stylesheet(module.STYLESHEET)
+        self.__modules[name] = module
+        return module
+
+    def __build(self, name: str) -> None:
+        """
+        Builds an app's windows hidden. Any top level windows the app shows from its constructor (i.e the TV
+        window) are hidden and remembered so they can be shown along with the main window. Native windows
+        are created up front so showing them later does no platform setup.
+        :param name: Key of the app in APPS
+        :return: None
+        """
+
+        application = QtWidgets.QApplication.instance()
+        visible = {widget for widget in application.topLevelWidgets() if widget.isVisible()}
+
+        app = Launcher.APPS[name]
+        if app["settings"]:
+            window = self.__load(name).Logic(*app["size"], settings_dir=self.__settings_dir)
+        else:
+            window = self.__load(name).Logic(*app["size"])
+        window.setWindowTitle(app["title"])
+
+        windows = [window] + [widget for widget in application.topLevelWidgets()
+                              if widget.isVisible() and widget not in visible and widget is not window]
+        for widget in windows:
+            widget.hide()
+            widget.ensurePolished()
+            widget.winId()
+
+        self.__windows[name] = windows
+
+    def open(self, name: str) -> None:
+        """
+        Shows an app's windows, building them first if they were not pre-built
+        :param name: Key of the app in APPS
+        :return: None
+        """
+
+        if name not in self.__windows:
+            self.__build(name)
+
+        for widget in reversed(self.__windows[name]):
+            widget.show()
+            widget.raise_()
+        self.__windows[name][0].activateWindow()
+
+
+def peak_memory_kb() -> int:
+    """
+    Gets the peak resident memory of this process
+    :return: Kilobytes, or None if not available on this platform
+    """
+
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # Reported in bytes on macOS, kilobytes on Linux
+
+
+def measure(apps: list, standby: bool, started: float, settings_dir: str) -> None:
+    """
+    Opens apps, waits for their windows to be shown, then prints a JSON line with the time taken from process
+    start and from the open request until the windows were shown, plus peak memory use, and exits. Used by
+    report() in a child process.
+    :param apps: Keys of the apps to open
+    :param standby: Pre-build windows before starting the open timer
+    :param started: time.time() when the parent started this process
+    :param settings_dir: Directory for app settings, a scratch directory so measuring never touches real settings
+    :return: None
+    """
+
+    application = QtWidgets.QApplication([])
+    launcher = Launcher(standby, settings_dir)
+
+    start = time.perf_counter()
+    for name in apps:
+        launcher.open(name)
+    application.processEvents()
+    open_ms = (time.perf_counter() - start) * 1000
+    window_ms = (time.time() - started) * 1000
+
+    print(json.dumps({"open_ms": open_ms, "window_ms": window_ms, "memory_kb": peak_memory_kb()}), flush=True)
+    QtCore.QTimer.singleShot(0, application.quit)
+    application.exec()
+
+
+def measure_main(name: str, started: float) -> None:
+    """
+    Runs an app's own main.py, as when the app is started on its own, but replaces the event loop with a single
+    pass that shows the windows, prints a JSON line like measure() does, and returns. Used by report() in a
+    child process, started in the directory the app should keep its files in.
+    :param name: Key of the app in APPS
+    :param started: time.time() when the parent started this process
+    :return: None
+    """
+
+    def exec_once(application: QtWidgets.QApplication) -> int:
+        application.processEvents()
+        window_ms = (time.time() - started) * 1000
+        print(json.dumps({"open_ms": None, "window_ms": window_ms, "memory_kb": peak_memory_kb()}), flush=True)
+        return 0
+
+    directory = os.path.join(Launcher.ROOT, Launcher.APPS[name]["directory"])
+    sys.path.insert(0, directory)
+    QtWidgets.QApplication.exec = exec_once
+    runpy.run_path(os.path.join(directory, "main.py"), run_name="__main__")
+
+
+def report() -> None:
+    """
+    Compares running both apps in separate processes, each from its own main.py, against running them in one
+    launcher, with and without standby. Time to window is measured from process start until every window has
+    been shown. Each measurement runs in its own empty directory, used as both working and settings directory,
+    so every run starts from defaults and real settings are left alone.
+    :return: None
+    """
+
+    with tempfile.TemporaryDirectory() as scratch:
+        def start(*args: str) -> subprocess.Popen:
+            settings_dir = tempfile.mkdtemp(dir=scratch)
+            return subprocess.Popen([sys.executable, os.path.abspath(__file__), "--measure", str(time.time()),
+                                     "--settings-dir", settings_dir, *args], cwd=settings_dir, stdout=subprocess.PIPE, text=True)
+
+        def finish(process: subprocess.Popen) -> dict:
+            result = json.loads(process.stdout.readline())
+            process.wait()
+            return result
+
+        # Both apps' main.py are started together, the same as the kiosk starting both entry points
+        separate = [finish(process) for process in [start("--main", name) for name in Launcher.APPS]]
+        combined = finish(start(*Launcher.APPS))
+        standby = finish(start("--standby", *Launcher.APPS))
+
+    def memory(kb) -> str:
+        return f"{kb / 1024:.1f} MB" if kb is not None else "n/a"
+
+    separate_memory = None if any(result["memory_kb"] is None for result in separate) else sum(result["memory_kb"] for result in separate)
+    print(f"{'':<22}{'time to window':>16}{'memory':>12}")
+    for name, result in zip(Launcher.APPS, separate):
+        print(f"{name + ' main.py':<22}{result['window_ms']:>13.0f} ms{memory(result['memory_kb']):>12}")
+    print(f"{'both main.py':<22}{max(result['window_ms'] for result in separate):>13.0f} ms{memory(separate_memory):>12}")
+    print(f"{'launcher':<22}{combined['window_ms']:>13.0f} ms{memory(combined['memory_kb']):>12}")
+    print(f"{'launcher standby':<22}{standby['window_ms']:>13.0f} ms{memory(standby['memory_kb']):>12}")
+    print(f"standby open on request: {standby['open_ms']:.1f} ms (launcher without standby: {combined['open_ms']:.1f} ms)")
+
+
+def main() -> None:
+    """
+    Starts the launcher, opening the requested apps or showing the standby panel
+    :return: None
+    """
+
+    parser = argparse.ArgumentParser(description="Run the TV remote and greenhouse controller in one process")
+    parser.add_argument("apps", nargs="*", help=f"apps to open on start ({', '.join(Launcher.APPS)}), defaults to all unless in standby")
+    parser.add_argument("--standby", action="store_true", help="pre-build windows hidden and show a panel that opens them near instantly")
+    parser.add_argument("--settings-dir", default=".", help="directory the greenhouse controller keeps its settings and history in (default: current directory)")
+    parser.add_argument("--report", action="store_true", help="compare time to window and memory against separate processes")
+    parser.add_argument("--measure", type=float, metavar="STARTED", help=argparse.SUPPRESS)
+    parser.add_argument("--main", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    for name in args.apps:
+        if name not in Launcher.APPS:
+            parser.error(f"unknown app {name!r}, choose from {', '.join(Launcher.APPS)}")
+
+    if args.report:
+        report()
+        return
+    if args.measure is not None and args.main:
+        measure_main(args.apps[0], args.measure)
+        return
+    if args.measure is not None:
+        measure(args.apps, args.standby, args.measure, args.settings_dir)
+        return
+
+    application = QtWidgets.QApplication([])
+    launcher = Launcher(args.standby, args.settings_dir)
+    if args.standby:
+        launcher.show()
+        apps = args.apps
+    else:
+        apps = args.apps or Launcher.APPS
+    for name in apps:
+        launcher.open(name)
+    application.exec()
+
+
+if __name__ == "__main__":
+    main()